@@ -1,7 +1,9 @@
 from __future__ import annotations
 import enum
-from typing import Any, overload
+import functools
+from typing import Any, Iterator, overload
 import ipaddress
+import re
 
 
 import asn1
@@ -53,10 +55,43 @@ class ASN1(enum.IntEnum, CodeMixin):
     GET_BULK_REQUEST = 0xA5
 
 
+def _tag_fields(tag: ASN1) -> tuple[int, int, int]:
+    return tag.class_, tag.pc, tag.tag_number
+
+
+def _encode_integer(value: int) -> bytes:
+    # Minimal two's complement, as asn1.Encoder._encode_integer but in one call
+    n_bytes = (value if value >= 0 else ~value).bit_length() // 8 + 1
+    return value.to_bytes(n_bytes, "big", signed=True)
+
+
+@functools.lru_cache(maxsize=4096)
+def _encode_oid(oid_key: tuple[int, ...]) -> bytes:
+    if len(oid_key) < 2 or oid_key[0] > 2 or (oid_key[0] <= 1 and oid_key[1] > 39):
+        raise asn1.Error("Illegal object identifier")
+    result = bytearray()
+    for sub_id in (40 * oid_key[0] + oid_key[1],) + oid_key[2:]:
+        if sub_id < 0x80:
+            result.append(sub_id)
+            continue
+        groups = [sub_id & 0x7F]
+        sub_id >>= 7
+        while sub_id:
+            groups.append(0x80 | (sub_id & 0x7F))
+            sub_id >>= 7
+        result.extend(reversed(groups))
+    return bytes(result)
+
+
 class SNMPValue:
+    __slots__ = ("tag",)
+    _fields: tuple[str, ...] = ("tag",)
+
     def __init__(self, tag: ASN1) -> None:
         self.tag = tag
 
+    # Constructed subclasses shadow these with plain class attributes for
+    # Encoder.enter(); leaf values are written straight from their tag.
     @property
     def class_(self) -> int:
         return self.tag.class_
@@ -71,6 +106,9 @@ class SNMPValue:
 
 
 class SNMPLeafValue(SNMPValue):
+    __slots__ = ("value",)
+    _fields = ("tag", "value")
+
     def __init__(self, value: Any, tag: ASN1) -> None:
         super().__init__(tag)
         self.value = value
@@ -80,14 +118,18 @@ class SNMPLeafValue(SNMPValue):
 
 
 class Integer(SNMPLeafValue):
+    __slots__ = ()
+
     def __init__(self, value: int) -> None:
         super().__init__(value, ASN1.INTEGER)
 
     def encode(self) -> bytes:
-        return asn1.Encoder._encode_integer(self.value)
+        return _encode_integer(self.value)
 
 
 class Boolean(SNMPLeafValue):
+    __slots__ = ()
+
     def __init__(self, value: bool) -> None:
         super().__init__(value, ASN1.INTEGER)
 
@@ -96,6 +138,8 @@ class Boolean(SNMPLeafValue):
 
 
 class OctetString(SNMPLeafValue):
+    __slots__ = ()
+
     def __init__(self, value: str) -> None:
         super().__init__(value, ASN1.OCTET_STRING)
 
@@ -104,6 +148,8 @@ class OctetString(SNMPLeafValue):
 
 
 class Null(SNMPLeafValue):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(None, ASN1.NULL)
 
@@ -112,14 +158,22 @@ class Null(SNMPLeafValue):
 
 
 class ObjectIdentifier(SNMPLeafValue):
+    __slots__ = ()
+
     def __init__(self, value: str) -> None:
         super().__init__(value, ASN1.OBJECT_IDENTIFIER)
 
     def encode(self) -> bytes:
-        return asn1.Encoder()._encode_object_identifier(self.value)
+        try:
+            oid_key = _oid_key(self.value)
+        except ValueError:
+            raise asn1.Error("Illegal object identifier") from None
+        return _encode_oid(oid_key)
 
 
 class IPAddress(SNMPLeafValue):
+    __slots__ = ()
+
     def __init__(self, value: str) -> None:
         super().__init__(value, ASN1.IPADDRESS)
 
@@ -128,38 +182,48 @@ class IPAddress(SNMPLeafValue):
 
 
 class Counter32(SNMPLeafValue):
+    __slots__ = ()
+
     def __init__(self, value: int) -> None:
         super().__init__(value, ASN1.COUNTER32)
 
     def encode(self) -> bytes:
-        return asn1.Encoder._encode_integer(self.value)
+        return _encode_integer(self.value)
 
 
 class Gauge32(SNMPLeafValue):
+    __slots__ = ()
+
     def __init__(self, value: int) -> None:
         super().__init__(value, ASN1.GAUGE32)
 
     def encode(self) -> bytes:
-        return asn1.Encoder._encode_integer(self.value)
+        return _encode_integer(self.value)
 
 
 class TimeTicks(SNMPLeafValue):
+    __slots__ = ()
+
     def __init__(self, value: int) -> None:
         super().__init__(value, ASN1.TIME_TICKS)
 
     def encode(self) -> bytes:
-        return asn1.Encoder._encode_integer(self.value)
+        return _encode_integer(self.value)
 
 
 class Counter64(SNMPLeafValue):
+    __slots__ = ()
+
     def __init__(self, value: int) -> None:
         super().__init__(value, ASN1.COUNTER64)
 
     def encode(self) -> bytes:
-        return asn1.Encoder._encode_integer(self.value)
+        return _encode_integer(self.value)
 
 
 class NoSuchObject(SNMPLeafValue):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(None, ASN1.NO_SUCH_OBJECT)
 
@@ -168,6 +232,8 @@ class NoSuchObject(SNMPLeafValue):
 
 
 class NoSuchInstance(SNMPLeafValue):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(None, ASN1.NO_SUCH_INSTANCE)
 
@@ -176,6 +242,8 @@ class NoSuchInstance(SNMPLeafValue):
 
 
 class EndOfMibView(SNMPLeafValue):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(None, ASN1.END_OF_MIB_VIEW)
 
@@ -183,69 +251,114 @@ class EndOfMibView(SNMPLeafValue):
         return b""
 
 
+# Empty values carry no state, so a single instance of each is shared
+_NULL = Null()
+_NO_SUCH_OBJECT = NoSuchObject()
+_NO_SUCH_INSTANCE = NoSuchInstance()
+_END_OF_MIB_VIEW = EndOfMibView()
+
+
 class SNMPConstructedValue(SNMPValue):
-    pass
+    __slots__ = ()
 
 
 class Sequence(SNMPConstructedValue):
+    __slots__ = ()
+    class_, pc, tag_number = _tag_fields(ASN1.SEQUENCE)
+
     def __init__(self) -> None:
         super().__init__(ASN1.SEQUENCE)
 
 
 class SnmpContext(SNMPConstructedValue):
-    pass
+    __slots__ = ()
 
 
 class SnmpGetContext(SnmpContext):
+    __slots__ = ()
+    class_, pc, tag_number = _tag_fields(ASN1.GET_REQUEST)
+
     def __init__(self) -> None:
         super().__init__(ASN1.GET_REQUEST)
 
 
 class SnmpGetNextContext(SnmpContext):
+    __slots__ = ()
+    class_, pc, tag_number = _tag_fields(ASN1.GET_NEXT_REQUEST)
+
     def __init__(self) -> None:
         super().__init__(ASN1.GET_NEXT_REQUEST)
 
 
 class SnmpGetBulkContext(SnmpContext):
+    __slots__ = ()
+    class_, pc, tag_number = _tag_fields(ASN1.GET_BULK_REQUEST)
+
     def __init__(self) -> None:
         super().__init__(ASN1.GET_BULK_REQUEST)
 
 
 class SnmpGetResponseContext(SnmpContext):
+    __slots__ = ()
+    class_, pc, tag_number = _tag_fields(ASN1.GET_RESPONSE)
+
     def __init__(self) -> None:
         super().__init__(ASN1.GET_RESPONSE)
 
 
-_TAG_2_CONEXT = {
-    ASN1.GET_REQUEST: SnmpGetContext,
-    ASN1.GET_NEXT_REQUEST: SnmpGetNextContext,
-    ASN1.GET_BULK_REQUEST: SnmpGetBulkContext
+# Contexts carry no per-message state, so a single instance of each is shared
+_TAG_2_CONTEXT: dict[int, SnmpContext] = {
+    ASN1.GET_REQUEST: SnmpGetContext(),
+    ASN1.GET_NEXT_REQUEST: SnmpGetNextContext(),
+    ASN1.GET_BULK_REQUEST: SnmpGetBulkContext(),
 }
+_GET_RESPONSE_CONTEXT = SnmpGetResponseContext()
+
+
+_SHORT_LENGTHS = tuple(bytes((length,)) for length in range(0x80))
+
+
+def _encode_length(length: int) -> bytes:
+    if length < 0x80:
+        return _SHORT_LENGTHS[length]
+    n_bytes = (length.bit_length() + 7) // 8
+    return bytes((0x80 | n_bytes,)) + length.to_bytes(n_bytes, "big")
 
 
 class Encoder:
-    _encode: asn1.Encoder
+    _buffer: bytearray
+    _starts: list[int]
 
     def __init__(self) -> None:
-        self._encoder = asn1.Encoder()
-        self._encoder.start()
+        self._buffer = bytearray()
+        self._starts = []
 
     def enter(self, value: SNMPConstructedValue):
-        self._encoder.enter(cls=value.class_, nr=value.tag_number)
+        # The length is only known on leave(), where it is spliced in
+        # front of the contents written since this call.
+        self._buffer.append(value.class_ | 0x20 | value.tag_number)
+        self._starts.append(len(self._buffer))
 
     def leave(self) -> None:
-        self._encoder.leave()
+        if not self._starts:
+            raise asn1.Error("Call to leave() without a corresponding enter() call.")
+        start = self._starts.pop()
+        self._buffer[start:start] = _encode_length(len(self._buffer) - start)
 
     def write(self, value: SNMPLeafValue) -> None:
-        self._encoder._emit_tag(
-            cls=value.class_, typ=value.pc, nr=value.tag_number
-        )
+        # Every SNMP tag number is below 31, so the tag itself is the
+        # identifier octet.
         value_bytes = value.encode()
-        self._encoder._emit_length(len(value_bytes))
-        self._encoder._emit(value_bytes)
+        self._buffer.append(value.tag)
+        self._buffer += _encode_length(len(value_bytes))
+        self._buffer += value_bytes
 
     def output(self) -> bytes:
-        return self._encoder.output()
+        if self._starts:
+            raise asn1.Error(
+                "Some constructed types have not been closed. Call leave() first."
+            )
+        return bytes(self._buffer)
 
 
 def encode_response(response: SNMPResponse) -> bytes:
@@ -295,6 +408,10 @@ class Decoder:
         self._decoder.leave()
 
 
+# Poll traffic uses very few distinct communities
+_decode_community = functools.lru_cache(maxsize=32)(bytes.decode)
+
+
 def decode_request(data: bytes) -> SNMPRequest:
     decoder = Decoder(data=data)
 
@@ -310,16 +427,17 @@ def decode_request(data: bytes) -> SNMPRequest:
         ) from None
 
     _, _value = decoder.read()
-    community = _value.decode()
+    community = _decode_community(_value)
 
     # Get pdu_type, request_id, non_repeaters and max_repetitions
     _tag = decoder.peek()
-    _pdu_type_code = ASN1(_tag.cls | _tag.typ | _tag.nr)
-    try:
-        context = _TAG_2_CONEXT[_pdu_type_code]()
-    except KeyError:
+    # Plain int lookup: ASN1 members hash as their int values, and unknown
+    # PDU types must not go through the ASN1 enum constructor (ValueError)
+    _pdu_type_code: int = _tag.cls | _tag.typ | _tag.nr
+    context = _TAG_2_CONTEXT.get(_pdu_type_code)
+    if context is None:
         raise NotImplementedError(
-            f"PDU-TYPE code '{_pdu_type_code}' is not implemented"
+            f"PDU-TYPE code '{_pdu_type_code:#x}' is not implemented"
         )
 
     decoder.enter()
@@ -348,7 +466,7 @@ def decode_request(data: bytes) -> SNMPRequest:
         _, _value = decoder.read()
         oid: str = _value
         _, _ = decoder.read()
-        variable_bindings.append(VariableBinding(oid=oid, value=Null()))
+        variable_bindings.append(VariableBinding(oid=oid, value=_NULL))
         decoder.leave()
     decoder.leave()
     decoder.leave()
@@ -365,7 +483,21 @@ def decode_request(data: bytes) -> SNMPRequest:
     )
 
 
+_PRIMITIVE_TYPES = (int, str, bool, bytes)
+
+
+def _attributes(value: Any) -> Iterator[tuple[str, Any]]:
+    # Slotted classes list the attributes to_dict() reports in _fields; an
+    # instance __dict__ (e.g. from a subclass without __slots__) is added
+    for name in getattr(value, "_fields", ()):
+        yield name, getattr(value, name)
+    yield from getattr(value, "__dict__", {}).items()
+
+
 class SNMP:
+    __slots__ = ()
+    _fields: tuple[str, ...] = ()
+
     def __init__(self) -> None:
         pass
 
@@ -407,27 +539,31 @@ class SNMP:
 
     @staticmethod
     def _to_primitive(value):
-        match value:
-            case dict():
-                _dict = {}
-                for k, v in value.items():
-                    _dict[k] = SNMP._to_primitive(v)
-                return _dict
-            case list():
-                items = []
-                for item in value:
-                    items.append(SNMP._to_primitive(item))
-                return items
-            case int() | str() | bool() | bytes() | None:
-                return value
-            case _:
-                _dict = {}
-                for k, v in vars(value).items():
-                    _dict[k] = SNMP._to_primitive(v)
-                return _dict
+        if value is None or isinstance(value, _PRIMITIVE_TYPES):
+            return value
+        if isinstance(value, dict):
+            return {k: SNMP._to_primitive(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [SNMP._to_primitive(item) for item in value]
+        return {
+            k: SNMP._to_primitive(v)
+            for k, v in _attributes(value)
+            if not k.startswith("_")
+        }
 
 
 class SNMPRequest(SNMP):
+    _fields = (
+        "version",
+        "community",
+        "context",
+        "request_id",
+        "non_repeaters",
+        "max_repetitions",
+        "variable_bindings",
+    )
+    __slots__ = _fields
+
     def __init__(
         self,
         version: VERSION,
@@ -463,6 +599,17 @@ class SNMPRequest(SNMP):
 
 
 class SNMPResponse(SNMP):
+    _fields = (
+        "version",
+        "community",
+        "context",
+        "request_id",
+        "error_status",
+        "error_index",
+        "variable_bindings",
+    )
+    __slots__ = _fields
+
     def __init__(
         self,
         version: VERSION,
@@ -474,17 +621,49 @@ class SNMPResponse(SNMP):
     ) -> None:
         self.version = version
         self.community = community
-        self.context = SnmpGetResponseContext()
+        self.context = _GET_RESPONSE_CONTEXT
         self.request_id = request_id
         self.error_status = error_status
         self.error_index = error_index
         self.variable_bindings = variable_bindings
 
 
+_OID_PATTERN = re.compile(r"[0-9]+(\.[0-9]+)*")
+
+
+# A bounded cache rather than sys.intern(): request OIDs come from untrusted
+# datagrams, and interned strings are never freed on some CPython versions.
+@functools.lru_cache(maxsize=4096)
+def _canonical_oid(oid: str) -> str:
+    return oid.lstrip(".")
+
+
+@functools.lru_cache(maxsize=4096)
+def _oid_key(oid: str) -> tuple[int, ...]:
+    # int() alone would also accept e.g. " 6", "+6" or "6_1"
+    if not _OID_PATTERN.fullmatch(oid):
+        raise ValueError(f"Illegal object identifier '{oid}'")
+    return tuple(map(int, oid.split(".")))
+
+
 class VariableBinding(SNMP):
+    __slots__ = ("_oid", "value", "_key")
+    _fields = ("oid", "value")
+
     def __init__(self, oid: str, value: SNMPLeafValue) -> None:
-        self.oid = oid.lstrip(".")
+        self.oid = oid
         self.value = value
 
+    # The setter keeps the cached numeric key in step with the oid
+    @property
+    def oid(self) -> str:
+        return self._oid
+
+    @oid.setter
+    def oid(self, oid: str) -> None:
+        oid = _canonical_oid(oid)
+        self._key = _oid_key(oid)
+        self._oid = oid
+
     def encode(self) -> bytes:
         return self.value.encode()
@@ -1,54 +1,108 @@
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Optional, Union
+
 from . import snmp
 
 
-def handle_request(
-    req: snmp.SNMPRequest, vbs: list[snmp.VariableBinding]
-) -> list[snmp.VariableBinding]:
-    match req.context:
-        case snmp.SnmpGetContext():
-            return get(req_vbs=req.variable_bindings, vbs=vbs)
-        case snmp.SnmpGetNextContext():
-            return get_next(req_vbs=req.variable_bindings, vbs=vbs)
-        case snmp.SnmpGetBulkContext():
-            return get_bulk(
-                req_vbs=req.variable_bindings,
-                non_repeaters=req.non_repeaters,
-                max_repetitions=req.max_repetitions,
-                vbs=vbs,
-            )
-        case _:
-            raise NotImplementedError
+# Variable-bindings kept sorted by OID. Build it once and pass it to
+# handle_request instead of a list, so the MIB is not re-sorted per request.
+class MibIndex:
+    def __init__(self, vbs: Iterable[snmp.VariableBinding] = ()) -> None:
+        self._vbs = sorted(vbs, key=lambda x: x._key)
+        self._keys = [vb._key for vb in self._vbs]
+        # Only get() needs the oid lookup, so it is built on first use
+        self._by_oid: Optional[dict[str, snmp.VariableBinding]] = None
+
+    def __len__(self) -> int:
+        return len(self._vbs)
+
+    # A binding whose OID is already indexed replaces the existing one
+    def add(self, vb: snmp.VariableBinding) -> None:
+        position = bisect_left(self._keys, vb._key)
+        if position < len(self._keys) and self._keys[position] == vb._key:
+            if self._by_oid is not None:
+                self._by_oid.pop(self._vbs[position].oid, None)
+            self._vbs[position] = vb
+        else:
+            self._keys.insert(position, vb._key)
+            self._vbs.insert(position, vb)
+        if self._by_oid is not None:
+            self._by_oid[vb.oid] = vb
+
+    def _oid_map(self) -> dict[str, snmp.VariableBinding]:
+        if self._by_oid is None:
+            # reversed so that the first binding wins for duplicated oids
+            self._by_oid = {vb.oid: vb for vb in reversed(self._vbs)}
+        return self._by_oid
+
+
+Bindings = Union[list[snmp.VariableBinding], MibIndex]
+
+
+def _as_index(vbs: Bindings) -> MibIndex:
+    if isinstance(vbs, MibIndex):
+        return vbs
+    return MibIndex(vbs)
+
+
+def _do_get(req: snmp.SNMPRequest, vbs: Bindings) -> list[snmp.VariableBinding]:
+    return get(req_vbs=req.variable_bindings, vbs=vbs)
+
+
+def _do_get_next(req: snmp.SNMPRequest, vbs: Bindings) -> list[snmp.VariableBinding]:
+    return get_next(req_vbs=req.variable_bindings, vbs=vbs)
+
+
+def _do_get_bulk(req: snmp.SNMPRequest, vbs: Bindings) -> list[snmp.VariableBinding]:
+    return get_bulk(
+        req_vbs=req.variable_bindings,
+        non_repeaters=req.non_repeaters,
+        max_repetitions=req.max_repetitions,
+        vbs=vbs,
+    )
+
+
+def handle_request(req: snmp.SNMPRequest, vbs: Bindings) -> list[snmp.VariableBinding]:
+    handler = _DISPATCH.get(type(req.context))
+    if handler is None:
+        raise NotImplementedError
+    return handler(req, vbs)
 
 
 def get(
-    req_vbs: list[snmp.VariableBinding], vbs: list[snmp.VariableBinding]
+    req_vbs: list[snmp.VariableBinding],
+    vbs: Bindings,
 ) -> list[snmp.VariableBinding]:
-    results: list[snmp.VariableBinding] = []
-    for req_vb in req_vbs:
-        _results = [vb for vb in vbs if req_vb.oid == vb.oid]
-        if _results:
-            _result = _results[0]
-        else:
-            _result = snmp.VariableBinding(oid=req_vb.oid, value=snmp.NoSuchObject())
-        results.append(_result)
+    if isinstance(vbs, MibIndex):
+        by_oid = vbs._oid_map()
+    else:
+        # reversed so that the first binding wins for duplicated oids
+        by_oid = {vb.oid: vb for vb in reversed(vbs)}
+    results: list[snmp.VariableBinding]
+    results = [None] * len(req_vbs)  # type: ignore[list-item]
+    for i, req_vb in enumerate(req_vbs):
+        _result = by_oid.get(req_vb.oid)
+        if _result is None:
+            _result = snmp.VariableBinding(oid=req_vb.oid, value=snmp._NO_SUCH_OBJECT)
+        results[i] = _result
     return results
 
 
 def get_next(
-    req_vbs: list[snmp.VariableBinding], vbs: list[snmp.VariableBinding]
+    req_vbs: list[snmp.VariableBinding],
+    vbs: Bindings,
 ) -> list[snmp.VariableBinding]:
-    sorted_vbs = sorted(vbs, key=lambda x: [int(o) for o in x.oid.split(".")])
-    results: list[snmp.VariableBinding] = []
-    for req_vb in req_vbs:
-        next_vb = snmp.VariableBinding(oid=req_vb.oid, value=snmp.EndOfMibView())
-        for vb in sorted_vbs:
-            if [int(o) for o in req_vb.oid.split(".")] < [
-                int(o) for o in vb.oid.split(".")
-            ]:
-                next_vb.oid = vb.oid
-                next_vb.value = vb.value
-                break
-        results.append(next_vb)
+    index = _as_index(vbs)
+    sorted_vbs, keys = index._vbs, index._keys
+    results: list[snmp.VariableBinding]
+    results = [None] * len(req_vbs)  # type: ignore[list-item]
+    for i, req_vb in enumerate(req_vbs):
+        position = bisect_right(keys, req_vb._key)
+        if position < len(sorted_vbs):
+            next_vb = sorted_vbs[position]
+        else:
+            next_vb = snmp.VariableBinding(oid=req_vb.oid, value=snmp._END_OF_MIB_VIEW)
+        results[i] = next_vb
     return results
 
 
@@ -56,17 +110,33 @@ def get_bulk(
     req_vbs: list[snmp.VariableBinding],
     non_repeaters: int,
     max_repetitions: int,
-    vbs: list[snmp.VariableBinding],
+    vbs: Bindings,
 ) -> list[snmp.VariableBinding]:
+    index = _as_index(vbs)
     # non_repeaters
-    _req_vbs = req_vbs[:non_repeaters]
-    results = get_next(req_vbs=_req_vbs, vbs=vbs)
-    # max_repetitions
+    _results = get_next(req_vbs=req_vbs[:non_repeaters], vbs=index)
     _req_vbs = req_vbs[non_repeaters:]
+    results: list[snmp.VariableBinding]
+    results = [None] * (  # type: ignore[list-item]
+        len(_results) + len(_req_vbs) * max(max_repetitions, 0)
+    )
+    results[: len(_results)] = _results
+    position = len(_results)
+    # max_repetitions
+    # each repetition only depends on the previous one, so look up a whole
+    # row of successors per get_next call
     for _ in range(max_repetitions):
-        for index, req_vb in enumerate(_req_vbs):
-            _results = get_next(req_vbs=[req_vb], vbs=vbs)
-            _result = _results[0]
-            results.append(_result)
-            _req_vbs[index] = snmp.VariableBinding(oid=_result.oid, value=snmp.Null())
+        _results = get_next(req_vbs=_req_vbs, vbs=index)
+        results[position : position + len(_results)] = _results
+        position += len(_results)
+        # get_next only reads the key of a request binding, which each
+        # result already carries
+        _req_vbs = _results
     return results
+
+
+_DISPATCH = {
+    snmp.SnmpGetContext: _do_get,
+    snmp.SnmpGetNextContext: _do_get_next,
+    snmp.SnmpGetBulkContext: _do_get_bulk,
+}
@@ -0,0 +1,293 @@
+import asn1
+import pytest
+
+from snmp_agent import snmp
+
+
+def test_variable_binding_strips_leading_dot():
+    vb = snmp.VariableBinding(".1.3.6.1.2.1.1.1.0", snmp.Null())
+    assert vb.oid == "1.3.6.1.2.1.1.1.0"
+    assert vb._key == (1, 3, 6, 1, 2, 1, 1, 1, 0)
+
+
+def test_variable_binding_oid_assignment_updates_key():
+    vb = snmp.VariableBinding("1.3.6.1.1.0", snmp.Null())
+    vb.oid = "1.3.6.1.9.0"
+    assert vb.oid == "1.3.6.1.9.0"
+    assert vb._key == (1, 3, 6, 1, 9, 0)
+    assert vb.to_dict()["oid"] == "1.3.6.1.9.0"
+
+
+@pytest.mark.parametrize(
+    "oid", ["", "1..3", "1.3.", "1.3.-5", "1.3.6_1", "1.3. 6", "a"]
+)
+def test_variable_binding_rejects_malformed_oid(oid):
+    with pytest.raises(ValueError):
+        snmp.VariableBinding(oid, snmp.Null())
+
+
+@pytest.mark.parametrize(
+    "oid",
+    [
+        "0.0",
+        "1.3",
+        "2.39",
+        "2.40",
+        "2.999.1",
+        "1.3.6.1.2.1.1.1.0",
+        "1.3.6.1.4.1.127.128.16383.16384.2097151.2097152",
+        "1.3.6.1.4.1.4294967295.18446744073709551616",
+    ],
+)
+def test_object_identifier_encodes_like_asn1(oid):
+    expected = asn1.Encoder()._encode_object_identifier(oid)
+    assert snmp.ObjectIdentifier(oid).encode() == expected
+
+
+@pytest.mark.parametrize(
+    "oid",
+    ["", "1", "3.1", "1.40", ".1.3", "1..3", "1.3.", "1.3.-5", "1.3.6_1", "1.3. 6"],
+)
+def test_object_identifier_rejects_malformed_oid_like_asn1(oid):
+    with pytest.raises(asn1.Error):
+        asn1.Encoder()._encode_object_identifier(oid)
+    with pytest.raises(asn1.Error):
+        snmp.ObjectIdentifier(oid).encode()
+
+
+def _asn1_encode(build):
+    encoder = asn1.Encoder()
+    encoder.start()
+    build(encoder)
+    return encoder.output()
+
+
+@pytest.mark.parametrize("length", [0, 1, 127, 128, 255, 256, 300, 65536])
+def test_encoder_lengths_match_asn1(length):
+    value = "x" * length
+
+    encoder = snmp.Encoder()
+    encoder.enter(snmp.Sequence())
+    encoder.write(snmp.OctetString(value))
+    encoder.leave()
+
+    def build(expected):
+        expected.enter(asn1.Numbers.Sequence)
+        expected.write(value, asn1.Numbers.OctetString)
+        expected.leave()
+
+    assert encoder.output() == _asn1_encode(build)
+
+
+def test_encoder_nested_sequences_match_asn1():
+    encoder = snmp.Encoder()
+    encoder.enter(snmp.Sequence())
+    encoder.write(snmp.Integer(1))
+    encoder.enter(snmp.SnmpGetResponseContext())
+    encoder.write(snmp.Integer(-129))
+    encoder.enter(snmp.Sequence())
+    for i in range(40):
+        encoder.enter(snmp.Sequence())
+        encoder.write(snmp.OctetString("value %d" % i))
+        encoder.leave()
+    encoder.leave()
+    encoder.leave()
+    encoder.leave()
+
+    def build(expected):
+        expected.enter(asn1.Numbers.Sequence)
+        expected.write(1, asn1.Numbers.Integer)
+        expected.enter(0x02, cls=asn1.Classes.Context)
+        expected.write(-129, asn1.Numbers.Integer)
+        expected.enter(asn1.Numbers.Sequence)
+        for i in range(40):
+            expected.enter(asn1.Numbers.Sequence)
+            expected.write("value %d" % i, asn1.Numbers.OctetString)
+            expected.leave()
+        expected.leave()
+        expected.leave()
+        expected.leave()
+
+    assert encoder.output() == _asn1_encode(build)
+
+
+def test_encoder_leave_without_enter_raises():
+    encoder = snmp.Encoder()
+    with pytest.raises(asn1.Error):
+        encoder.leave()
+
+
+def test_encoder_output_with_open_sequence_raises():
+    encoder = snmp.Encoder()
+    encoder.enter(snmp.Sequence())
+    with pytest.raises(asn1.Error):
+        encoder.output()
+
+
+def test_encode_response_matches_asn1():
+    values = [
+        (snmp.Integer(-1), asn1.Encoder._encode_integer(-1)),
+        (snmp.OctetString("s" * 200), b"s" * 200),
+        (snmp.Counter32(200), asn1.Encoder._encode_integer(200)),
+        (snmp.Gauge32(2**32 - 1), asn1.Encoder._encode_integer(2**32 - 1)),
+        (snmp.TimeTicks(0), asn1.Encoder._encode_integer(0)),
+        (snmp.Counter64(2**64 - 1), asn1.Encoder._encode_integer(2**64 - 1)),
+        (snmp.IPAddress("10.0.0.1"), bytes([10, 0, 0, 1])),
+        (snmp.ObjectIdentifier("1.3.6.1"), bytes([0x2B, 6, 1])),
+        (snmp.Null(), b""),
+        (snmp.NoSuchObject(), b""),
+        (snmp.EndOfMibView(), b""),
+    ]
+    response = snmp.SNMPResponse(
+        version=snmp.VERSION.V2C,
+        community="public",
+        request_id=1234,
+        variable_bindings=[
+            snmp.VariableBinding("1.3.6.1.2.1.%d.0" % i, value)
+            for i, (value, _) in enumerate(values)
+        ],
+    )
+
+    def write(expected, tag, value_bytes):
+        expected._emit_tag(cls=tag.class_, typ=tag.pc, nr=tag.tag_number)
+        expected._emit_length(len(value_bytes))
+        expected._emit(value_bytes)
+
+    def build(expected):
+        expected.enter(asn1.Numbers.Sequence)
+        expected.write(1, asn1.Numbers.Integer)
+        expected.write("public", asn1.Numbers.OctetString)
+        expected.enter(0x02, cls=asn1.Classes.Context)
+        expected.write(1234, asn1.Numbers.Integer)
+        expected.write(0, asn1.Numbers.Integer)
+        expected.write(0, asn1.Numbers.Integer)
+        expected.enter(asn1.Numbers.Sequence)
+        for i, (value, value_bytes) in enumerate(values):
+            expected.enter(asn1.Numbers.Sequence)
+            expected.write("1.3.6.1.2.1.%d.0" % i, asn1.Numbers.ObjectIdentifier)
+            write(expected, value.tag, value_bytes)
+            expected.leave()
+        expected.leave()
+        expected.leave()
+        expected.leave()
+
+    assert snmp.encode_response(response) == _asn1_encode(build)
+
+
+def test_variable_binding_oids_share_a_bounded_cache():
+    first = snmp.VariableBinding(".1.3.6.1.2.1.1.1.0", snmp.Null())
+    second = snmp.VariableBinding(".1.3.6.1.2.1.1.1.0", snmp.Null())
+    assert first.oid is second.oid
+    assert snmp._canonical_oid.cache_info().maxsize is not None
+
+
+def _encode_request(pdu_type, oids, non_repeaters=0, max_repetitions=0):
+    encoder = asn1.Encoder()
+    encoder.start()
+    encoder.enter(asn1.Numbers.Sequence)
+    encoder.write(1, asn1.Numbers.Integer)
+    encoder.write(b"public", asn1.Numbers.OctetString)
+    encoder.enter(pdu_type & 0x1F, cls=asn1.Classes.Context)
+    encoder.write(1234, asn1.Numbers.Integer)
+    encoder.write(non_repeaters, asn1.Numbers.Integer)
+    encoder.write(max_repetitions, asn1.Numbers.Integer)
+    encoder.enter(asn1.Numbers.Sequence)
+    for oid in oids:
+        encoder.enter(asn1.Numbers.Sequence)
+        encoder.write(oid, asn1.Numbers.ObjectIdentifier)
+        encoder.write(None, asn1.Numbers.Null)
+        encoder.leave()
+    encoder.leave()
+    encoder.leave()
+    encoder.leave()
+    return encoder.output()
+
+
+def test_decode_request():
+    data = _encode_request(0xA5, ["1.3.6.1.2.1.1.1.0", "1.3.6.1.2.1.2.2.1.1"], 1, 10)
+    req = snmp.decode_request(data)
+    assert req.version == snmp.VERSION.V2C
+    assert req.community == "public"
+    assert isinstance(req.context, snmp.SnmpGetBulkContext)
+    assert req.request_id == 1234
+    assert req.non_repeaters == 1
+    assert req.max_repetitions == 10
+    assert [vb.oid for vb in req.variable_bindings] == [
+        "1.3.6.1.2.1.1.1.0",
+        "1.3.6.1.2.1.2.2.1.1",
+    ]
+    assert all(isinstance(vb.value, snmp.Null) for vb in req.variable_bindings)
+
+
+def test_decode_request_ignores_bulk_fields_for_get():
+    req = snmp.decode_request(_encode_request(0xA0, ["1.3.6.1.2.1.1.1.0"], 1, 10))
+    assert isinstance(req.context, snmp.SnmpGetContext)
+    assert req.non_repeaters == 0
+    assert req.max_repetitions == 0
+
+
+def test_decode_request_reuses_community_and_oid_strings():
+    data = _encode_request(0xA1, ["1.3.6.1.2.1.1.1.0"])
+    first = snmp.decode_request(data)
+    second = snmp.decode_request(data)
+    assert first.community is second.community
+    assert first.variable_bindings[0].oid is second.variable_bindings[0].oid
+
+
+def test_decode_request_rejects_unknown_pdu_type():
+    with pytest.raises(NotImplementedError):
+        snmp.decode_request(_encode_request(0xA4, ["1.3.6.1.2.1.1.1.0"]))
+
+
+def test_request_and_response_to_dict():
+    req = snmp.decode_request(_encode_request(0xA0, ["1.3.6.1.2.1.1.3.0"]))
+    assert req.to_dict() == {
+        "version": snmp.VERSION.V2C,
+        "community": "public",
+        "context": {"tag": snmp.ASN1.GET_REQUEST},
+        "request_id": 1234,
+        "non_repeaters": 0,
+        "max_repetitions": 0,
+        "variable_bindings": [
+            {
+                "oid": "1.3.6.1.2.1.1.3.0",
+                "value": {"tag": snmp.ASN1.NULL, "value": None},
+            }
+        ],
+    }
+
+    res = req.create_response(
+        [snmp.VariableBinding("1.3.6.1.2.1.1.3.0", snmp.TimeTicks(100))]
+    )
+    res_dict = res.to_dict()
+    assert list(res_dict) == [
+        "version",
+        "community",
+        "context",
+        "request_id",
+        "error_status",
+        "error_index",
+        "variable_bindings",
+    ]
+    assert res_dict["version"] == snmp.VERSION.V2C
+    assert res_dict["context"] == {"tag": snmp.ASN1.GET_RESPONSE}
+    assert res_dict["variable_bindings"] == [
+        {
+            "oid": "1.3.6.1.2.1.1.3.0",
+            "value": {"tag": snmp.ASN1.TIME_TICKS, "value": 100},
+        }
+    ]
+
+
+def test_to_dict_includes_unslotted_subclass_attributes():
+    class Tagged(snmp.VariableBinding):
+        pass
+
+    vb = Tagged("1.3.6.1", snmp.Integer(1))
+    vb.note = "extra"
+    vb._hidden = "private"
+    assert vb.to_dict() == {
+        "oid": "1.3.6.1",
+        "value": {"tag": snmp.ASN1.INTEGER, "value": 1},
+        "note": "extra",
+    }
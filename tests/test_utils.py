@@ -0,0 +1,111 @@
+import pytest
+
+from snmp_agent import snmp, utils
+
+
+def _vbs():
+    return [
+        snmp.VariableBinding("1.3.6.1.2.1.2.2.1.10.1", snmp.Counter32(1000)),
+        snmp.VariableBinding("1.3.6.1.2.1.1.1.0", snmp.OctetString("System")),
+        snmp.VariableBinding("1.3.6.1.2.1.2.2.1.2.1", snmp.OctetString("fxp0")),
+        snmp.VariableBinding("1.3.6.1.2.1.1.3.0", snmp.TimeTicks(100)),
+        snmp.VariableBinding("1.3.6.1.2.1.2.2.1.1.1", snmp.Integer(1)),
+    ]
+
+
+def _request(context, oids, non_repeaters=0, max_repetitions=0):
+    return snmp.SNMPRequest(
+        version=snmp.VERSION.V2C,
+        community="public",
+        context=context,
+        request_id=1,
+        variable_bindings=[snmp.VariableBinding(oid, snmp.Null()) for oid in oids],
+        non_repeaters=non_repeaters,
+        max_repetitions=max_repetitions,
+    )
+
+
+def _summary(vbs):
+    return [(vb.oid, type(vb.value).__name__, vb.value.value) for vb in vbs]
+
+
+def test_mib_index_sorts_bindings():
+    index = utils.MibIndex(_vbs())
+    assert len(index) == 5
+    assert [vb.oid for vb in index._vbs] == [
+        "1.3.6.1.2.1.1.1.0",
+        "1.3.6.1.2.1.1.3.0",
+        "1.3.6.1.2.1.2.2.1.1.1",
+        "1.3.6.1.2.1.2.2.1.2.1",
+        "1.3.6.1.2.1.2.2.1.10.1",
+    ]
+    assert index._keys == [vb._key for vb in index._vbs]
+
+
+def test_mib_index_add_inserts_in_order():
+    index = utils.MibIndex(_vbs())
+    index.add(snmp.VariableBinding("1.3.6.1.2.1.2.1.0", snmp.Integer(1)))
+    assert len(index) == 6
+    assert index._keys == sorted(index._keys)
+    result = utils.get_next(
+        [snmp.VariableBinding("1.3.6.1.2.1.1.3.0", snmp.Null())], index
+    )
+    assert _summary(result) == [("1.3.6.1.2.1.2.1.0", "Integer", 1)]
+
+
+def test_mib_index_add_replaces_same_oid():
+    oid = "1.3.6.1.2.1.1.3.0"
+    index = utils.MibIndex(_vbs())
+    # build the oid lookup first, so add() has to keep it up to date
+    utils.get([snmp.VariableBinding(oid, snmp.Null())], index)
+    index.add(snmp.VariableBinding(oid, snmp.TimeTicks(200)))
+    assert len(index) == 5
+    req_vbs = [snmp.VariableBinding(oid, snmp.Null())]
+    assert _summary(utils.get(req_vbs, index)) == [(oid, "TimeTicks", 200)]
+    prev = [snmp.VariableBinding("1.3.6.1.2.1.1.1.0", snmp.Null())]
+    assert _summary(utils.get_next(prev, index)) == [(oid, "TimeTicks", 200)]
+
+
+@pytest.mark.parametrize(
+    "req, expected",
+    [
+        (
+            _request(snmp.SnmpGetContext(), ["1.3.6.1.2.1.1.3.0", "1.3.6.1.2.1.1.2.0"]),
+            [
+                ("1.3.6.1.2.1.1.3.0", "TimeTicks", 100),
+                ("1.3.6.1.2.1.1.2.0", "NoSuchObject", None),
+            ],
+        ),
+        (
+            _request(
+                snmp.SnmpGetNextContext(), ["1.3.6.1.2.1.1", "1.3.6.1.2.1.2.2.1.10.1"]
+            ),
+            [
+                ("1.3.6.1.2.1.1.1.0", "OctetString", "System"),
+                ("1.3.6.1.2.1.2.2.1.10.1", "EndOfMibView", None),
+            ],
+        ),
+        (
+            _request(
+                snmp.SnmpGetBulkContext(),
+                ["1.3.6.1.2.1.1.1.0", "1.3.6.1.2.1.2.2.1.1", "1.3.6.1.2.1.2.2.1.2"],
+                non_repeaters=1,
+                max_repetitions=3,
+            ),
+            [
+                ("1.3.6.1.2.1.1.3.0", "TimeTicks", 100),
+                ("1.3.6.1.2.1.2.2.1.1.1", "Integer", 1),
+                ("1.3.6.1.2.1.2.2.1.2.1", "OctetString", "fxp0"),
+                ("1.3.6.1.2.1.2.2.1.2.1", "OctetString", "fxp0"),
+                ("1.3.6.1.2.1.2.2.1.10.1", "Counter32", 1000),
+                ("1.3.6.1.2.1.2.2.1.10.1", "Counter32", 1000),
+                ("1.3.6.1.2.1.2.2.1.10.1", "EndOfMibView", None),
+            ],
+        ),
+    ],
+)
+def test_handle_request_list_and_mib_index_agree(req, expected):
+    from_list = utils.handle_request(req=req, vbs=_vbs())
+    from_index = utils.handle_request(req=req, vbs=utils.MibIndex(_vbs()))
+    assert _summary(from_list) == expected
+    assert _summary(from_index) == expected